@@ -6,24 +6,32 @@ SAP SuccessFactors Talent Management topics and returns relevant help links.
 """
 
 import logging
+import os
+import threading
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+import orjson
+from anyio import to_thread
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from intent_classifier import get_classifier
+from batcher import AsyncBatcher
+from intent_classifier import BATCH_MAX_SIZE, get_classifier
 from models import (
+    BatchClassifyRequest,
+    BatchClassifyResponse,
     ClassifyRequest,
     ClassifyResponse,
     ContentFilteringDetails,
     ContentFilterScores,
     DataMaskingDetails,
     HealthResponse,
-    LinkInfo,
     LLMDetails,
     LLMMessage,
     PipelineDetails,
+    ServiceInfoResponse,
 )
+from topic_links import TOPIC_DISPLAY_NAMES, TOPIC_LINK_MODELS
 
 # Configure logging
 logging.basicConfig(
@@ -32,15 +40,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Worker threads available for blocking classifier calls (anyio defaults to 40).
+# Each thread mostly waits on the LLM, so this bounds in-flight orchestration calls.
+THREADPOOL_SIZE = 64
+
+# Pack concurrent single-query requests into one orchestration call. Off by default:
+# it delays every request by up to the batch window and puts unrelated users' queries
+# into the same LLM context. /api/v1/classify/batch always batches its own queries.
+REQUEST_BATCHING = os.getenv("REQUEST_BATCHING", "false").lower() == "true"
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize resources on startup."""
     logger.info("Initializing Intent Classifier...")
-    get_classifier()  # Pre-initialize the classifier
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    classifier = get_classifier()  # Pre-initialize the classifier
+    app.state.batcher = None
+    if REQUEST_BATCHING:
+        app.state.batcher = AsyncBatcher(classifier.classify_batch, max_batch=BATCH_MAX_SIZE)
+        await app.state.batcher.start()
+    # Warm the orchestration connection in the background; startup doesn't wait for it.
+    # A daemon thread, so a slow warm-up call can't hold up shutdown either.
+    threading.Thread(target=classifier.warm_up, name="orchestration-warm-up", daemon=True).start()
     logger.info("Application started successfully")
     yield
     logger.info("Application shutting down")
+    if app.state.batcher is not None:
+        await app.state.batcher.stop()
 
 
 app = FastAPI(
@@ -71,13 +98,19 @@ and returns relevant help portal links.
     lifespan=lifespan,
 )
 
-# CORS middleware for cross-origin requests from Joule
+# CORS middleware for cross-origin browser requests. Joule itself calls the API
+# server-to-server through the BTP destination, so no browser origin is allowed unless
+# listed in CORS_ALLOW_ORIGINS (comma-separated). Credentials are not allowed, so
+# Starlette sends static headers instead of reflecting each request's headers.
+CORS_ALLOW_ORIGINS = [
+    origin.strip() for origin in os.getenv("CORS_ALLOW_ORIGINS", "").split(",") if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=CORS_ALLOW_ORIGINS,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
 )
 
 
@@ -95,6 +128,56 @@ async def health_check():
     )
 
 
+def _to_classify_response(result: dict, pipeline: PipelineDetails | None = None) -> ClassifyResponse:
+    """Build the response model from a classifier result dict."""
+    # The classifier output is already schema-checked and links are the shared
+    # LinkInfo models precomputed from TOPIC_LINKS, so skip re-validation
+    return ClassifyResponse.model_construct(
+        is_talent_management=result["is_talent_management"],
+        confidence=result["confidence"],
+        topic=result["topic"],
+        topic_display_name=result["topic_display_name"],
+        links=list(result["links"]),
+        summary=result["summary"],
+        pipeline=pipeline,
+    )
+
+
+def _body_template(topic: str | None) -> tuple[bytes, bytes, bytes]:
+    """Serialize the response for a topic (None: not TM), split around confidence and summary."""
+    body = orjson.dumps({
+        "is_talent_management": topic is not None,
+        "confidence": "__confidence__",
+        "topic": topic,
+        "topic_display_name": TOPIC_DISPLAY_NAMES[topic] if topic else None,
+        "links": [link.model_dump() for link in TOPIC_LINK_MODELS[topic]] if topic else [],
+        "summary": "__summary__",
+        "pipeline": None,
+    })
+    head, _, rest = body.partition(b'"__confidence__"')
+    middle, _, tail = rest.partition(b'"__summary__"')
+    return head, middle, tail
+
+
+# ClassifyResponse JSON bodies pre-serialized per (is_talent_management, topic). Only
+# confidence and summary vary per request, so those are the only values serialized.
+_BODY_TEMPLATES = {
+    (False, None): _body_template(None),
+    **{(True, topic): _body_template(topic) for topic in TOPIC_LINK_MODELS},
+}
+
+
+def _render_classify_response(result: dict) -> bytes:
+    """Render a classifier result (without pipeline details) as a ClassifyResponse JSON body."""
+    template = _BODY_TEMPLATES.get((result["is_talent_management"], result["topic"]))
+    if template is None:
+        return _to_classify_response(result).model_dump_json().encode()
+    head, middle, tail = template
+    return b"".join(
+        (head, orjson.dumps(result["confidence"]), middle, orjson.dumps(result["summary"]), tail)
+    )
+
+
 @app.post(
     "/api/v1/classify",
     response_model=ClassifyResponse,
@@ -135,11 +218,23 @@ async def classify_query(request: ClassifyRequest):
     """
     try:
         classifier = get_classifier()
-        result = classifier.classify(request.query, include_pipeline=request.show_pipeline)
+        if not request.show_pipeline:
+            # Empty, pre-filtered and cached queries are answered right away; the rest go
+            # to the LLM, packed with concurrent requests when REQUEST_BATCHING is on
+            result = classifier.answer_without_llm(request.query)
+            if result is None and app.state.batcher is not None:
+                result = await app.state.batcher.submit(request.query)
+            elif result is None:
+                result = await to_thread.run_sync(classifier.classify, request.query)
+            # The result is written straight into its pre-serialized response body
+            return Response(content=_render_classify_response(result), media_type="application/json")
 
-        # Build pipeline details if requested
+        # Pipeline details are per-query, so these requests bypass batching
+        result = await to_thread.run_sync(classifier.classify, request.query, True)
+
+        # Build pipeline details
         pipeline = None
-        if request.show_pipeline and "pipeline" in result:
+        if "pipeline" in result:
             pipeline_data = result["pipeline"]
             pipeline = PipelineDetails(
                 data_masking=DataMaskingDetails(**pipeline_data["data_masking"])
@@ -153,30 +248,56 @@ async def classify_query(request: ClassifyRequest):
                 messages_to_llm=[LLMMessage(**msg) for msg in pipeline_data["messages_to_llm"]],
             )
 
-        return ClassifyResponse(
-            is_talent_management=result["is_talent_management"],
-            confidence=result["confidence"],
-            topic=result["topic"],
-            topic_display_name=result["topic_display_name"],
-            links=[LinkInfo(**link) for link in result["links"]],
-            summary=result["summary"],
-            pipeline=pipeline,
-        )
+        return _to_classify_response(result, pipeline)
     except Exception as e:
-        logger.error(f"Classification failed: {e}")
+        logger.error("Classification failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         raise HTTPException(
             status_code=500,
             detail="An error occurred while classifying the query. Please try again.",
         )
 
 
-@app.get("/", tags=["Root"])
+@app.post(
+    "/api/v1/classify/batch",
+    response_model=BatchClassifyResponse,
+    tags=["Classification"],
+    summary="Classify several user queries",
+    description="Classifies a list of queries concurrently and returns the results in the same order.",
+)
+async def classify_queries(request: BatchClassifyRequest):
+    """
+    Classify several user queries for Talent Management topics.
+
+    Queries are sent to the LLM in groups of up to 16 per orchestration call, and the
+    groups run concurrently. Pipeline details are not available for batches.
+
+    **Example Request:**
+    ```json
+    {
+        "queries": ["How do I submit my annual performance review?", "How do I request time off?"]
+    }
+    ```
+    """
+    try:
+        results = await get_classifier().aclassify_many(request.queries)
+        # Returning a Response skips FastAPI re-checking every result against response_model
+        body = b'{"results":[' + b",".join(map(_render_classify_response, results)) + b"]}"
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        logger.error("Batch classification failed: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while classifying the queries. Please try again.",
+        )
+
+
+@app.get("/", response_model=ServiceInfoResponse, tags=["Root"])
 async def root():
     """Root endpoint with API information."""
-    return {
-        "service": "Talent Management Intent Classifier API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "health": "/health",
-        "classify": "/api/v1/classify",
-    }
+    return ServiceInfoResponse(
+        service="Talent Management Intent Classifier API",
+        version="1.0.0",
+        docs="/docs",
+        health="/health",
+        classify="/api/v1/classify",
+    )
@@ -0,0 +1,96 @@
+"""
+Micro-batching of Concurrent Classification Requests
+
+Queries that arrive within a short window are collected and handed to the
+classifier as one batch, so a burst of requests shares a single orchestration
+call (and its prompt prefix) instead of paying for one call each.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from contextlib import suppress
+
+from anyio import to_thread
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBatcher:
+    """Collects queries into batches of up to max_batch, waiting at most max_wait seconds."""
+
+    def __init__(
+        self,
+        handler: Callable[[list[str]], list[dict]],
+        max_batch: int = 16,
+        max_wait: float = 0.03,
+    ):
+        """
+        Args:
+            handler: Blocking function classifying a list of queries, results in input order
+            max_batch: Maximum number of queries per batch
+            max_wait: Seconds to wait for more queries after the first one arrives
+        """
+        self._handler = handler
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._queue: asyncio.Queue | None = None
+        self._collector: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+
+    async def start(self):
+        """Start the background task that collects and dispatches batches."""
+        self._queue = asyncio.Queue()
+        self._collector = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        """Stop collecting and wait for in-flight batches to finish."""
+        if self._collector is not None:
+            self._collector.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._collector
+            self._collector = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def submit(self, query: str) -> dict:
+        """Queue a query and wait for its classification result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, future))
+        return await future
+
+    async def _collect(self):
+        """Drain the queue: wait for one query, then keep filling until full or timed out."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._max_wait
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch without awaiting so the next batch can be collected meanwhile
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: list[tuple[str, asyncio.Future]]):
+        """Run the blocking handler off the event loop and resolve each waiter."""
+        try:
+            results = await to_thread.run_sync(self._handler, [query for query, _ in batch])
+        except Exception as e:
+            logger.error("Batch of %d queries failed: %s", len(batch), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # The waiter may have gone away (e.g. client disconnected)
+            if not future.done():
+                future.set_result(result)
@@ -11,20 +11,34 @@ Uses Orchestration Service V2 features:
 - Data masking (PII anonymization)
 """
 
-import json
+import asyncio
 import logging
+import os
 import re
-
+import threading
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+import orjson
+from anyio import to_thread
 from dotenv import load_dotenv
 
 # Load environment variables from .env file (for local development)
 # This must happen before any GenAI Hub SDK imports that read AICORE_* vars
 load_dotenv()
 
-from topic_links import TOPIC_LINKS, get_topics_for_prompt
+import pipeline_debug
+from mock_classifier import MOCK_TOPIC_KEYWORDS, mock_classify
+from response_cache import ResponseCache, normalize_query
+from text_utils import query_words, trie_pattern
+from topic_links import TOPIC_DISPLAY_NAMES, TOPIC_LINK_MODELS, TOPIC_LINKS, get_topics_for_prompt
 
-# Lazy imports for GenAI Hub Orchestration SDK (may not be available locally)
+# Optional imports for GenAI Hub Orchestration SDK (may not be available locally)
 try:
+    import httpx
+    from gen_ai_hub.proxy.core.proxy_clients import get_proxy_client
     from gen_ai_hub.orchestration.service import OrchestrationService
     from gen_ai_hub.orchestration.models.message import SystemMessage, UserMessage
     from gen_ai_hub.orchestration.models.template import Template, TemplateValue
@@ -52,55 +66,334 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-# JSON schema for classification response - ensures valid, structured output
+# Maximum number of LLM classification responses kept in the in-process cache
+RESPONSE_CACHE_SIZE = 4096
+
+# Default number of orchestration calls aclassify_many() keeps in flight at once
+CLASSIFY_MANY_CONCURRENCY = 50
+
+# Orchestration error codes worth retrying (rate limited, temporarily unavailable),
+# with exponential backoff starting at ORCHESTRATION_RETRY_BACKOFF seconds
+RETRYABLE_ERROR_CODES = frozenset({429, 503})
+ORCHESTRATION_MAX_RETRIES = 2
+ORCHESTRATION_RETRY_BACKOFF = 0.5
+
+# JSON schema for classification response - ensures valid, structured output.
+# Field-level rules live in the descriptions rather than as prose in the system prompt;
+# the response formats are strict, so the enum and range are enforced, not just hinted.
 CLASSIFICATION_SCHEMA = {
     "type": "object",
     "properties": {
         "is_talent_management": {"type": "boolean"},
-        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
-        "topic": {"type": ["string", "null"]},
-        "reasoning": {"type": "string"},
-        "summary": {"type": "string"}
+        "confidence": {
+            "type": "number",
+            "minimum": 0,
+            "maximum": 1,
+            "description": "Classification certainty",
+        },
+        "topic": {
+            "type": ["string", "null"],
+            "enum": [*TOPIC_LINKS, None],
+            "description": "Single most relevant topic key; null if not Talent Management",
+        },
+        "reasoning": {"type": "string", "description": "One short sentence"},
+        "summary": {
+            "type": "string",
+            "description": (
+                "1-2 natural, conversational sentences acknowledging the question; "
+                "if Talent Management, say relevant resources follow"
+            ),
+        }
     },
     "required": ["is_talent_management", "confidence", "topic", "reasoning", "summary"],
     "additionalProperties": False
 }
 
+# Prompt text is static (TOPIC_LINKS never changes), so it is built once at import.
+# The orchestration templates fill in {{?user_query}} / {{?queries_json}} server-side.
+SYSTEM_PROMPT = f"""You classify HR queries as SAP SuccessFactors Talent Management (TM) topics.
+Topics (key: examples):
+{get_topics_for_prompt()}
+If ambiguous, choose the most likely topic."""
+
+USER_PROMPT = "Classify this query: {{?user_query}}"
+
+BATCH_USER_PROMPT = (
+    "Classify each query in this JSON array independently. Return exactly one "
+    "result per query, in the same order: {{?queries_json}}"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ClassificationResult:
+    """Typed LLM output, matching CLASSIFICATION_SCHEMA field for field."""
+
+    is_talent_management: bool
+    confidence: float
+    topic: str | None
+    reasoning: str
+    summary: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ClassificationResult":
+        """
+        Build a result from one decoded classification object.
+
+        Missing fields get defaults (not TM, confidence 0.5) and unknown fields are
+        ignored. Wrong types, a confidence outside 0-1 or an unknown topic raise
+        ValueError, since responses are built without pydantic validation.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Classification result must be a JSON object")
+        is_tm = data.get("is_talent_management", False)
+        confidence = data.get("confidence", 0.5)
+        topic = data.get("topic")
+        reasoning = data.get("reasoning", "")
+        summary = data.get("summary", "")
+
+        if not isinstance(is_tm, bool):
+            raise ValueError(f"is_talent_management must be a boolean, got {is_tm!r}")
+        if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+            raise ValueError(f"confidence must be a number, got {confidence!r}")
+        if not 0 <= confidence <= 1:
+            raise ValueError(f"confidence must be between 0 and 1, got {confidence!r}")
+        if topic is not None and topic not in TOPIC_LINKS:
+            raise ValueError(f"Unknown topic {topic!r}")
+        if not isinstance(reasoning, str) or not isinstance(summary, str):
+            raise ValueError("reasoning and summary must be strings")
+        return cls(is_tm, float(confidence), topic, reasoning, summary)
+
+    @classmethod
+    def from_json(cls, content: str | bytes) -> "ClassificationResult":
+        """Decode and check one classification object (raises ValueError if it is invalid)."""
+        return cls.from_dict(orjson.loads(content))
+
+
+# Maximum number of queries packed into a single orchestration call
+BATCH_MAX_SIZE = 16
+
+# Completion budget per classification. One result object is ~110 tokens (the summary
+# is the only free-form field), so this caps runaway generations without truncating.
+LLM_MAX_TOKENS = 200
+
+# Structured outputs require an object at the root, so the array is wrapped in "results"
+BATCH_CLASSIFICATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {"type": "array", "items": CLASSIFICATION_SCHEMA}
+    },
+    "required": ["results"],
+    "additionalProperties": False
+}
+
+
+def _is_content_filter_error(error: Exception) -> bool:
+    """Whether an orchestration error comes from content filtering (input or output filter)."""
+    return "filter" in (getattr(error, "location", None) or "").lower()
+
+
+# Pre-LLM screen: a query mentioning one of these words and no TM word is answered
+# as non-TM without an orchestration call
+NON_TM_WORDS = frozenset({
+    "password",
+    "laptop",
+    "computer",
+    "printer",
+    "wifi",
+    "weather",
+    "vpn",
+})
+
+# Minimum number of NON_TM_WORDS a query must contain to be screened out
+PREFILTER_MIN_MATCHES = 1
+
+# Every word from the topic catalogue and mock keywords; a query word starting with any
+# of these ("appraisals", "paycheck") sends the query to the LLM. Very short words
+# ("in", "of") carry no signal and are left out.
+_TM_WORDS = frozenset(
+    word
+    for phrase in [
+        *TOPIC_LINKS,
+        *(info["display_name"] for info in TOPIC_LINKS.values()),
+        *(keyword for info in TOPIC_LINKS.values() for keyword in info["keywords"]),
+        *(keyword for _, keywords in MOCK_TOPIC_KEYWORDS for keyword in keywords),
+    ]
+    for word in query_words(phrase.lower())
+    if len(word) >= 3
+)
+# Anchored at word starts, so "pto" doesn't match inside "laptop"
+_TM_WORD_RE = re.compile(r"\b" + trie_pattern(sorted(_TM_WORDS)))
+
+# Stream LLM output and stop reading as soon as the JSON object is complete.
+# Off by default; pipeline requests always use the non-streaming call.
+ORCHESTRATION_STREAMING = os.getenv("ORCHESTRATION_STREAMING", "false").lower() == "true"
+
+
+class _JsonObjectScanner:
+    """Tracks brace depth across streamed chunks to find where the top-level JSON object ends."""
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> int | None:
+        """Consume a chunk; return the index just past the closing brace once the object is complete."""
+        for i, char in enumerate(text):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    return i + 1
+        return None
+
+
+# Response templates for LLM results, copied per call. Only confidence and summary
+# come from the LLM; the placeholders keep the response's key order.
+_NON_TM_TEMPLATE = {
+    "is_talent_management": False,
+    "confidence": 0.0,
+    "topic": None,
+    "topic_display_name": None,
+    "links": (),
+    "summary": "",
+}
+
+_TM_TEMPLATES = {
+    topic: {
+        "is_talent_management": True,
+        "confidence": 0.0,
+        "topic": topic,
+        "topic_display_name": TOPIC_DISPLAY_NAMES[topic],
+        "links": TOPIC_LINK_MODELS[topic],
+        "summary": "",
+    }
+    for topic in TOPIC_LINKS
+}
+
+# Returned (as a copy) when classification fails unexpectedly
+_FALLBACK_RESPONSE = {
+    "is_talent_management": False,
+    "confidence": 0.0,
+    "topic": None,
+    "topic_display_name": None,
+    "links": (),
+    "summary": "Unable to classify the query. Please try again or rephrase your question.",
+}
+
+# Other fixed responses, built once and returned as shallow copies (callers may add keys)
+_EMPTY_QUERY_RESPONSE = {
+    "is_talent_management": False,
+    "confidence": 1.0,
+    "topic": None,
+    "topic_display_name": None,
+    "links": (),
+    "summary": "Please provide a valid query.",
+}
+
+_CONTENT_FILTERED_RESPONSE = {
+    "is_talent_management": False,
+    "confidence": 0.0,
+    "topic": None,
+    "topic_display_name": None,
+    "links": (),
+    "summary": "Your query was blocked by content filtering. Please rephrase your question.",
+}
+
+_PREFILTER_RESPONSE = {
+    "is_talent_management": False,
+    "confidence": 0.8,
+    "topic": None,
+    "topic_display_name": None,
+    "links": (),
+    "summary": "This doesn't seem to be a Talent Management question. I can help with topics like performance reviews, time off, learning, and more.",
+}
+
+# Orchestration configs (single, batch) are static, so they are built once per process
+# and shared by every IntentClassifier. The SDK deep-copies the config per request.
+_ORCHESTRATION_CONFIGS = None
+
+# Connection pool shared by all orchestration services in the process (sized to the
+# API's threadpool). HTTP/2 multiplexes concurrent calls over one TLS connection.
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+# Seconds to wait for a connection, and for each read. Orchestration answers in one
+# piece, so the read timeout also covers generation: a full batch of BATCH_MAX_SIZE
+# results takes ~20s. Without a limit a stalled call would hold its thread forever.
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 60.0
+_HTTP_CLIENT = None
+
+
+def _get_http_client() -> "httpx.Client":
+    """Get or create the shared HTTP client for orchestration calls."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+    return _HTTP_CLIENT
+
 
 class IntentClassifier:
-    """Classifies user queries into Talent Management topics using GPT-4 via Orchestration Service."""
+    """
+    Classifies user queries into Talent Management topics using GPT-4 via Orchestration Service.
+
+    A single instance is shared across the API's worker threads. This is safe because
+    OrchestrationService reuses one thread-safe httpx.Client and the response cache is
+    lock-protected; the classifier itself holds no per-request state.
+    """
 
     def __init__(self):
         """Initialize the classifier with GenAI Hub Orchestration Service."""
         self._service = None
+        self._batch_service = None
+        self._http = None
+        self._cache = ResponseCache(maxsize=RESPONSE_CACHE_SIZE)
         self._initialize_client()
 
     def _create_template(self) -> "Template":
         """Create the prompt template with system and user messages."""
-        topics_list = get_topics_for_prompt()
-
         return Template(
             messages=[
-                SystemMessage(content=f"""You are an expert at classifying HR and Talent Management queries.
-Available Talent Management topics:
-{topics_list}
-
-Rules:
-- If the query is clearly about Talent Management, set is_talent_management to true
-- Choose the single most relevant topic from the list above
-- If ambiguous, choose the most likely topic
-- If NOT about Talent Management, set is_talent_management to false and topic to null
-- Confidence should reflect classification certainty (0.0-1.0)
-- Generate a brief, helpful summary (1-2 sentences) that:
-  - Acknowledges what the user is asking about
-  - If TM-related, mentions you'll provide relevant resources
-  - Is natural and conversational, not robotic"""),
-                UserMessage(content="Classify this query: {{?user_query}}")
+                SystemMessage(content=SYSTEM_PROMPT),
+                UserMessage(content=USER_PROMPT)
             ],
             response_format=ResponseFormatJsonSchema(
                 name="classification_result",
                 description="Intent classification result",
-                schema=CLASSIFICATION_SCHEMA
+                schema=CLASSIFICATION_SCHEMA,
+                strict=True
+            )
+        )
+
+    def _create_batch_template(self) -> "Template":
+        """Create the prompt template that classifies a JSON array of queries in one call."""
+        return Template(
+            messages=[
+                SystemMessage(content=SYSTEM_PROMPT),
+                UserMessage(content=BATCH_USER_PROMPT)
+            ],
+            response_format=ResponseFormatJsonSchema(
+                name="batch_classification_result",
+                description="Intent classification results, one per query",
+                schema=BATCH_CLASSIFICATION_SCHEMA,
+                strict=True
             )
         )
 
@@ -136,26 +429,99 @@ Rules:
 
     def _initialize_client(self):
         """Initialize the GenAI Hub Orchestration Service with all modules."""
+        # Cached responses came from the previous service (or mock), so drop them
+        self._cache.clear()
         if not GENAI_HUB_AVAILABLE:
             logger.info("GenAI Hub SDK not available - using mock classification")
             self._service = None
+            self._batch_service = None
             return
 
+        global _ORCHESTRATION_CONFIGS
         try:
-            # Create orchestration config with all modules
-            config = OrchestrationConfig(
-                template=self._create_template(),
-                llm=LLM(name="gpt-4o", parameters={"max_tokens": 500}),
-                filtering=self._create_content_filter(),
-                data_masking=self._create_data_masking()
+            if _ORCHESTRATION_CONFIGS is None:
+                _ORCHESTRATION_CONFIGS = (
+                    # Create orchestration config with all modules
+                    OrchestrationConfig(
+                        template=self._create_template(),
+                        llm=LLM(name="gpt-4o", parameters={"max_tokens": LLM_MAX_TOKENS}),
+                        filtering=self._create_content_filter(),
+                        data_masking=self._create_data_masking()
+                    ),
+                    # Same modules, but the prompt and schema handle a whole batch of queries
+                    OrchestrationConfig(
+                        template=self._create_batch_template(),
+                        llm=LLM(name="gpt-4o", parameters={"max_tokens": LLM_MAX_TOKENS * BATCH_MAX_SIZE}),
+                        filtering=self._create_content_filter(),
+                        data_masking=self._create_data_masking()
+                    ),
+                )
+            config, batch_config = _ORCHESTRATION_CONFIGS
+
+            # Both services share one proxy client (one auth token) and reuse the
+            # deployment URL discovered for the first, saving a lookup on startup
+            proxy_client = get_proxy_client(proxy_version="gen-ai-hub")
+            self._service = OrchestrationService(config=config, proxy_client=proxy_client)
+            self._batch_service = OrchestrationService(
+                api_url=self._service.api_url, config=batch_config, proxy_client=proxy_client
             )
 
-            self._service = OrchestrationService(config=config)
+            # Replace each service's private httpx.Client with the shared pooled one
+            self._http = _get_http_client()
+            for service in (self._service, self._batch_service):
+                service.close_http_connection()
+                service.client = self._http
             logger.info("GenAI Hub Orchestration service initialized successfully")
         except Exception as e:
-            logger.warning(f"Failed to initialize orchestration service: {e}")
+            logger.warning("Failed to initialize orchestration service: %s", e)
             logger.info("Classifier will use mock responses for local testing")
             self._service = None
+            self._batch_service = None
+
+    def warm_up(self) -> None:
+        """
+        Send one throwaway classification so the first real request doesn't pay for
+        the auth token fetch and the TLS/HTTP2 handshake. Failures are only logged.
+        """
+        if self._service is None:
+            return
+        try:
+            self._service.run(template_values=[TemplateValue(name="user_query", value="ping")])
+            logger.info("Orchestration connection warmed up")
+        except Exception as e:
+            logger.warning("Orchestration warm-up failed: %s", e)
+
+    def _answer_locally(self, query: str, include_pipeline: bool = False) -> tuple[str | None, dict | None]:
+        """
+        Answer a query without the LLM where possible: empty, mock, pre-filtered or cached.
+
+        Returns the cache key (the normalized query; None when no LLM call can follow) and
+        the response, which is None when the query has to go to the LLM. Pipeline requests
+        skip the pre-filter and cache, as they always run the full orchestration.
+        """
+        if not query or not query.strip():
+            return None, dict(_EMPTY_QUERY_RESPONSE)
+        if self._service is None:
+            # Mock response for local testing without GenAI Hub
+            response = dict(mock_classify(query.lower()))
+            if include_pipeline:
+                response["pipeline"] = pipeline_debug.mock_pipeline_details(query)
+            return None, response
+        if include_pipeline:
+            return None, None
+
+        # The normalized query is computed once and serves as both pre-filter input and cache key
+        cache_key = normalize_query(query)
+        return cache_key, self._prefilter(cache_key) or self._cache.get(cache_key)
+
+    def answer_without_llm(self, query: str) -> dict | None:
+        """
+        Answer a query that needs no LLM call: empty, mock, pre-filtered or cached.
+
+        Does no I/O, so it is safe to call on the event loop. Returns None when the
+        query has to go to the LLM.
+        """
+        return self._answer_locally(query)[1]
 
     def classify(self, query: str, include_pipeline: bool = False) -> dict:
         """
@@ -168,375 +534,233 @@ Rules:
         Returns:
             Dictionary with classification results
         """
-        if not query or not query.strip():
-            return {
-                "is_talent_management": False,
-                "confidence": 1.0,
-                "topic": None,
-                "topic_display_name": None,
-                "links": [],
-                "summary": "Please provide a valid query.",
-            }
+        cache_key, response = self._answer_locally(query, include_pipeline)
+        if response is not None:
+            return response
 
         try:
-            if self._service is None:
-                # Mock response for local testing without GenAI Hub
-                result = self._mock_classify(query)
-                if include_pipeline:
-                    result["pipeline"] = self._mock_pipeline_details(query)
-                return result
-
             # Run orchestration with template values
-            orch_result = self._service.run(
-                template_values=[TemplateValue(name="user_query", value=query)]
-            )
+            template_values = [TemplateValue(name="user_query", value=query)]
+            if ORCHESTRATION_STREAMING and not include_pipeline:
+                content = self._run_with_retry(self._run_streaming, template_values)
+            else:
+                orch_result = self._run_with_retry(self._service.run, template_values)
+                content = orch_result.orchestration_result.choices[0].message.content
 
             # ResponseFormatJsonSchema guarantees valid JSON - no markdown stripping needed
-            llm_result = json.loads(orch_result.orchestration_result.choices[0].message.content)
+            llm_result = ClassificationResult.from_json(content)
             response = self._format_response(llm_result)
 
             if include_pipeline:
-                response["pipeline"] = self._extract_pipeline_details(query, orch_result)
+                response["pipeline"] = pipeline_debug.extract_pipeline_details(query, orch_result)
+            else:
+                self._cache.put(cache_key, response)
 
             return response
 
         except OrchestrationError as e:
             # Content filtering blocked the request - extract pipeline details from exception
-            logger.warning(f"Orchestration blocked: {e}")
+            logger.warning("Orchestration blocked: %s", e)
             response = self._content_filtered_response(query, str(e))
             if include_pipeline:
-                response["pipeline"] = self._extract_pipeline_from_error(query, e)
+                response["pipeline"] = pipeline_debug.extract_pipeline_from_error(query, e)
             return response
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response: {e}")
+        except ValueError as e:  # Includes orjson.JSONDecodeError
+            logger.error("Failed to parse LLM response: %s", e)
             return self._fallback_response(query)
         except Exception as e:
-            logger.error(f"Classification error: {e}")
+            logger.error("Classification error: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return self._fallback_response(query)
 
-    def _format_response(self, llm_result: dict) -> dict:
-        """Format the LLM result into the API response format."""
-        is_tm = llm_result.get("is_talent_management", False)
-        topic = llm_result.get("topic")
-        confidence = llm_result.get("confidence", 0.5)
-        summary = llm_result.get("summary", "")
-
-        if is_tm and topic and topic in TOPIC_LINKS:
-            topic_info = TOPIC_LINKS[topic]
-            return {
-                "is_talent_management": True,
-                "confidence": confidence,
-                "topic": topic,
-                "topic_display_name": topic_info["display_name"],
-                "links": topic_info["links"],
-                "summary": summary,
-            }
-        else:
-            return {
-                "is_talent_management": False,
-                "confidence": confidence,
-                "topic": None,
-                "topic_display_name": None,
-                "links": [],
-                "summary": summary,
-            }
-
-    def _extract_pipeline_details(self, original_query: str, result) -> dict:
-        """Extract pipeline processing details from orchestration result."""
-        mr = result.module_results
-
-        # Extract masked query and entities from input_masking
-        masked_query = original_query
-        entities_masked = []
-        if mr.input_masking and mr.input_masking.data:
-            masked_template = mr.input_masking.data.get("masked_template", "")
-            # Extract entity types like MASKED_PERSON, MASKED_EMAIL
-            entities_masked = list(set(re.findall(r"MASKED_(\w+)", masked_template)))
-            # Try to extract the masked user query from the template
-            # The template structure is: system message + user message with masked content
-            if "Classify this query:" in masked_template:
-                match = re.search(r"Classify this query:\s*(.+?)(?:\n|$)", masked_template)
-                if match:
-                    masked_query = match.group(1).strip()
-
-        # Extract messages sent to LLM from templating module
-        messages_to_llm = []
-        if mr.templating:
-            for msg in mr.templating:
-                messages_to_llm.append({"role": msg.role, "content": msg.content})
-
-        # Extract content filtering scores
-        input_filter = {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": True}
-        output_filter = {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": True}
-
-        if mr.input_filtering and mr.input_filtering.data:
-            azure_scores = mr.input_filtering.data.get("azure_content_safety", {})
-            input_filter = {
-                "hate": azure_scores.get("Hate", 0),
-                "self_harm": azure_scores.get("SelfHarm", 0),
-                "sexual": azure_scores.get("Sexual", 0),
-                "violence": azure_scores.get("Violence", 0),
-                "passed": True,
-            }
-
-        if mr.output_filtering and mr.output_filtering.data:
-            choices = mr.output_filtering.data.get("choices", [{}])
-            if choices:
-                azure_scores = choices[0].get("azure_content_safety", {})
-                output_filter = {
-                    "hate": azure_scores.get("Hate", 0),
-                    "self_harm": azure_scores.get("SelfHarm", 0),
-                    "sexual": azure_scores.get("Sexual", 0),
-                    "violence": azure_scores.get("Violence", 0),
-                    "passed": True,
-                }
-
-        # Extract LLM details
-        orch = result.orchestration_result
-        llm_details = {
-            "model": orch.model if hasattr(orch, "model") else "unknown",
-            "prompt_tokens": orch.usage.prompt_tokens if hasattr(orch, "usage") and orch.usage else 0,
-            "completion_tokens": orch.usage.completion_tokens if hasattr(orch, "usage") and orch.usage else 0,
-        }
+    async def aclassify_many(
+        self, queries: list[str], concurrency: int = CLASSIFY_MANY_CONCURRENCY
+    ) -> list[dict]:
+        """
+        Classify several queries concurrently.
 
-        return {
-            "data_masking": {
-                "original_query": original_query,
-                "masked_query": masked_query,
-                "entities_masked": entities_masked,
-            } if entities_masked else None,
-            "content_filtering": {
-                "input": input_filter,
-                "output": output_filter,
-            },
-            "llm": llm_details,
-            "messages_to_llm": messages_to_llm,
-        }
+        Queries are split into groups of BATCH_MAX_SIZE (the size the batch config's
+        max_tokens is budgeted for), each classified with one orchestration call by
+        classify_batch(), so the prompt is paid per group rather than per query.
 
-    def _mock_pipeline_details(self, query: str) -> dict:
-        """Generate mock pipeline details for local testing."""
-        return {
-            "data_masking": None,  # No masking in mock mode
-            "content_filtering": {
-                "input": {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": True},
-                "output": {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": True},
-            },
-            "llm": {"model": "mock", "prompt_tokens": 0, "completion_tokens": 0},
-            "messages_to_llm": [
-                {"role": "system", "content": "[MOCK] System prompt would appear here"},
-                {"role": "user", "content": f"Classify this query: {query}"},
-            ],
-        }
+        Args:
+            queries: The user query texts
+            concurrency: Maximum number of groups in flight (keeps within rate limits)
 
-    def _mock_classify(self, query: str) -> dict:
-        """Mock classification for local testing without GenAI Hub."""
-        query_lower = query.lower()
-
-        # Non-TM patterns to check first (to avoid false positives)
-        non_tm_patterns = [
-            "password",
-            "laptop",
-            "computer",
-            "printer",
-            "wifi",
-            "weather",
-            "email setup",
-            "vpn",
-            "software install",
-        ]
-        if any(pattern in query_lower for pattern in non_tm_patterns):
-            return {
-                "is_talent_management": False,
-                "confidence": 0.90,
-                "topic": None,
-                "topic_display_name": None,
-                "links": [],
-                "summary": "[MOCK] This doesn't seem to be a Talent Management question. I can help with topics like performance reviews, time off, learning, and more.",
-            }
-
-        # Simple keyword-based mock classification (order matters for priority)
-        topic_matches = [
-            # Check more specific patterns first
-            ("employee_onboarding", [
-                "onboarding",
-                "new hire",
-                "new employee",
-                "orientation",
-                "first day",
-                "preboarding",
-            ]),
-            ("succession_planning", [
-                "succession",
-                "career path",
-                "talent pool",
-                "successor",
-                "next in line",
-                "leadership pipeline",
-                "high potential",
-            ]),
-            ("time_attendance", [
-                "time off",
-                "leave request",
-                "vacation",
-                "attendance",
-                "absence",
-                "pto",
-                "sick leave",
-                "timesheet",
-            ]),
-            ("performance_management", [
-                "performance",
-                "review",
-                "goal",
-                "feedback",
-                "appraisal",
-                "evaluation",
-            ]),
-            ("learning_development", [
-                "training",
-                "course",
-                "learn",
-                "certification",
-                "skill development",
-                "curriculum",
-            ]),
-            ("recruitment", [
-                "job posting",
-                "job opening",
-                "candidate",
-                "interview",
-                "recruiting",
-                "requisition",
-                "applicant",
-            ]),
-            ("compensation_benefits", [
-                "salary",
-                "bonus",
-                "pay",
-                "compensation",
-                "benefit",
-                "merit increase",
-            ]),
-            ("employee_central", [
-                "employee data",
-                "org chart",
-                "profile",
-                "organization",
-                "personal information",
-                "reporting structure",
-            ]),
-        ]
-
-        for topic, keywords in topic_matches:
-            if any(kw in query_lower for kw in keywords):
-                topic_info = TOPIC_LINKS[topic]
-                return {
-                    "is_talent_management": True,
-                    "confidence": 0.85,
-                    "topic": topic,
-                    "topic_display_name": topic_info["display_name"],
-                    "links": topic_info["links"],
-                    "summary": f"[MOCK] I can help you with {topic_info['display_name']}. Here are some resources that should answer your question.",
-                }
-
-        return {
-            "is_talent_management": False,
-            "confidence": 0.80,
-            "topic": None,
-            "topic_display_name": None,
-            "links": [],
-            "summary": "[MOCK] This doesn't seem to be a Talent Management question. I can help with topics like performance reviews, time off, learning, and more.",
-        }
+        Returns:
+            List of classification result dictionaries, in the same order as queries
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def classify_group(group: list[str]) -> list[dict]:
+            async with semaphore:
+                return await to_thread.run_sync(self.classify_batch, group)
+
+        groups = [queries[i:i + BATCH_MAX_SIZE] for i in range(0, len(queries), BATCH_MAX_SIZE)]
+        results = await asyncio.gather(*(classify_group(group) for group in groups))
+        return [result for group_results in results for result in group_results]
+
+    def _run_with_retry(self, run: Callable, template_values: list):
+        """
+        Call run(template_values=...) (a service's run, or _run_streaming), retrying
+        rate-limit and unavailable errors with backoff.
+        """
+        for attempt in range(ORCHESTRATION_MAX_RETRIES + 1):
+            try:
+                return run(template_values=template_values)
+            except OrchestrationError as e:
+                code = getattr(e, "code", None)
+                if code not in RETRYABLE_ERROR_CODES or attempt == ORCHESTRATION_MAX_RETRIES:
+                    raise
+                delay = ORCHESTRATION_RETRY_BACKOFF * 2 ** attempt
+                logger.warning("Orchestration returned %s, retrying in %.1fs", code, delay)
+                time.sleep(delay)
+
+    def _run_streaming(self, template_values: list) -> str:
+        """Stream the LLM output, returning the JSON object as soon as its closing brace arrives."""
+        scanner = _JsonObjectScanner()
+        parts = []
+        with ExitStack() as stack:
+            # The SSEClient opens the HTTP stream itself on the first iteration (entering it
+            # with `with` would open it twice), so only its exit is registered. That releases
+            # the HTTP/2 stream on the shared client when we stop early or on errors.
+            stream = stack.push(self._service.stream(template_values=template_values))
+            for chunk in stream:
+                choices = chunk.orchestration_result.choices if chunk.orchestration_result else None
+                if not choices or not choices[0].delta.content:
+                    continue
+                text = choices[0].delta.content
+                end = scanner.feed(text)
+                if end is not None:
+                    # Don't wait for trailing tokens or the [DONE] event
+                    parts.append(text[:end])
+                    break
+                parts.append(text)
+        return "".join(parts)
+
+    def _prefilter(self, query_lower: str) -> dict | None:
+        """
+        Return a non-TM response for clearly unrelated queries, or None to use the LLM.
+
+        Takes the lowercased query (callers pass its normalized cache key).
+        """
+        words = query_words(query_lower)
+        non_tm_matches = words & NON_TM_WORDS
+        if len(non_tm_matches) < PREFILTER_MIN_MATCHES or _TM_WORD_RE.search(query_lower):
+            return None
+
+        # Matched words (never the query itself, which may contain PII) help tune the lists
+        logger.info("Pre-filter classified query as non-TM (matched: %s)", sorted(non_tm_matches))
+        return dict(_PREFILTER_RESPONSE)
+
+    def classify_batch(self, queries: list[str]) -> list[dict]:
+        """
+        Classify several queries with a single orchestration call.
+
+        Queries _answer_locally() can answer (empty, mock, pre-filtered or cached) skip
+        the LLM, and duplicate queries are sent only once. Pipeline details are never
+        included.
+
+        Args:
+            queries: The user query texts
+
+        Returns:
+            List of classification result dictionaries, in the same order as queries
+        """
+        results: list[dict | None] = [None] * len(queries)
+        pending: dict[str, list[int]] = {}  # normalized query -> positions in the batch
+        for i, query in enumerate(queries):
+            cache_key, results[i] = self._answer_locally(query)
+            if results[i] is None:
+                pending.setdefault(cache_key, []).append(i)
+
+        if pending:
+            unique_queries = [queries[positions[0]] for positions in pending.values()]
+            responses = self._run_batch(unique_queries, list(pending))
+            for positions, response in zip(pending.values(), responses):
+                for i in positions:
+                    results[i] = dict(response)
+
+        return results
+
+    def _run_batch(self, queries: list[str], cache_keys: list[str]) -> list[dict]:
+        """Run one orchestration call for the queries, falling back to per-query calls."""
+        if len(queries) == 1:
+            return [self.classify(queries[0])]
+
+        try:
+            orch_result = self._run_with_retry(
+                self._batch_service.run,
+                # orjson keeps non-ASCII text as-is (no \uXXXX escapes), so data masking
+                # sees the same characters as in a single-query call
+                [TemplateValue(name="queries_json", value=orjson.dumps(queries).decode())],
+            )
+            content = orch_result.orchestration_result.choices[0].message.content
+            llm_results = [ClassificationResult.from_dict(item) for item in orjson.loads(content)["results"]]
+        except OrchestrationError as e:
+            if not _is_content_filter_error(e):
+                # Rate limited, unavailable or otherwise failing: more calls would only add load
+                logger.error("Batch orchestration failed: %s", e)
+                return [self._fallback_response(query) for query in queries]
+            # One blocked query fails the whole batch - classify individually so
+            # only that query gets the content-filtered response
+            logger.warning("Batch orchestration blocked, classifying individually: %s", e)
+            return self._classify_individually(queries)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error("Failed to parse batch LLM response: %s", e)
+            return self._classify_individually(queries)
+        except Exception as e:
+            logger.error("Batch classification error: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return [self._fallback_response(query) for query in queries]
+
+        if len(llm_results) != len(queries):
+            logger.warning("Batch returned %d results for %d queries", len(llm_results), len(queries))
+            return self._classify_individually(queries)
+
+        responses = [self._format_response(llm_result) for llm_result in llm_results]
+        for cache_key, response in zip(cache_keys, responses):
+            self._cache.put(cache_key, response)
+        return responses
+
+    def _classify_individually(self, queries: list[str]) -> list[dict]:
+        """
+        Classify queries with one orchestration call each.
+
+        The calls run one after another on the calling thread, so a failed batch
+        never puts more orchestration calls in flight than the batch itself did.
+        """
+        return [self.classify(query) for query in queries]
+
+    def _format_response(self, llm_result: ClassificationResult) -> dict:
+        """Format the LLM result into the API response format."""
+        template = _TM_TEMPLATES.get(llm_result.topic) if llm_result.is_talent_management else None
+        response = (template or _NON_TM_TEMPLATE).copy()
+        response["confidence"] = llm_result.confidence
+        response["summary"] = llm_result.summary
+        return response
 
     def _fallback_response(self, query: str) -> dict:
         """Fallback response when classification fails."""
-        return {
-            "is_talent_management": False,
-            "confidence": 0.0,
-            "topic": None,
-            "topic_display_name": None,
-            "links": [],
-            "summary": "Unable to classify the query. Please try again or rephrase your question.",
-        }
+        return dict(_FALLBACK_RESPONSE)
 
     def _content_filtered_response(self, query: str, error_message: str) -> dict:
         """Response when content filtering blocks the request."""
-        return {
-            "is_talent_management": False,
-            "confidence": 0.0,
-            "topic": None,
-            "topic_display_name": None,
-            "links": [],
-            "summary": "Your query was blocked by content filtering. Please rephrase your question.",
-        }
-
-    def _extract_pipeline_from_error(self, original_query: str, error: "OrchestrationError") -> dict:
-        """Extract pipeline details from an OrchestrationError (e.g., content filter block)."""
-        # Access module_results from the exception
-        mr = getattr(error, "module_results", {}) or {}
-
-        # Extract masked query if available
-        # Structure: input_masking -> data -> masked_template
-        masked_query = original_query
-        entities_masked = []
-        input_masking = mr.get("input_masking", {})
-        if input_masking:
-            masking_data = input_masking.get("data", {})
-            masked_template = masking_data.get("masked_template", "")
-            entities_masked = list(set(re.findall(r"MASKED_(\w+)", masked_template)))
-            if "Classify this query:" in masked_template:
-                match = re.search(r"Classify this query:\s*(.+?)(?:\n|$)", masked_template)
-                if match:
-                    masked_query = match.group(1).strip()
-
-        # Extract input filtering scores (this is where the block happened)
-        # Structure: input_filtering -> data -> azure_content_safety
-        input_filter = {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": True}
-        input_filtering = mr.get("input_filtering", {})
-        if input_filtering:
-            filter_data = input_filtering.get("data", {})
-            azure_scores = filter_data.get("azure_content_safety", {})
-            input_filter = {
-                "hate": azure_scores.get("Hate", 0),
-                "self_harm": azure_scores.get("SelfHarm", 0),
-                "sexual": azure_scores.get("Sexual", 0),
-                "violence": azure_scores.get("Violence", 0),
-                "passed": False,  # Content was blocked
-            }
-
-        # Output filtering won't have run if input was blocked
-        output_filter = {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": False}
-
-        # Extract templating messages if available
-        messages_to_llm = []
-        templating = mr.get("templating", [])
-        if templating:
-            for msg in templating:
-                if isinstance(msg, dict):
-                    messages_to_llm.append({"role": msg.get("role", ""), "content": msg.get("content", "")})
-
-        return {
-            "data_masking": {
-                "original_query": original_query,
-                "masked_query": masked_query,
-                "entities_masked": entities_masked,
-            } if entities_masked else None,
-            "content_filtering": {
-                "input": input_filter,
-                "output": output_filter,
-            },
-            "llm": {"model": "blocked", "prompt_tokens": 0, "completion_tokens": 0},
-            "messages_to_llm": messages_to_llm,
-        }
-
+        return dict(_CONTENT_FILTERED_RESPONSE)
 
 # Singleton instance
 _classifier_instance = None
+_classifier_lock = threading.Lock()
 
 
 def get_classifier() -> IntentClassifier:
-    """Get or create the classifier singleton instance."""
+    """
+    Get or create the classifier singleton instance.
+
+    Thread-safe: concurrent first calls construct only one IntentClassifier (and one
+    proxy client). The app's lifespan calls this at startup, before serving requests.
+    """
     global _classifier_instance
     if _classifier_instance is None:
-        _classifier_instance = IntentClassifier()
+        with _classifier_lock:
+            if _classifier_instance is None:
+                _classifier_instance = IntentClassifier()
     return _classifier_instance
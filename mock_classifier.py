@@ -0,0 +1,172 @@
+"""
+Keyword-based Mock Classifier
+
+Used in place of the LLM for local development and tests when the GenAI Hub SDK
+or AI Core credentials are not available. Results are memoized per query and
+returned as read-only mappings shared between callers.
+"""
+
+import functools
+import re
+from types import MappingProxyType
+
+from text_utils import query_words, trie_pattern
+from topic_links import TOPIC_DISPLAY_NAMES, TOPIC_LINK_MODELS
+
+# Non-TM patterns are checked first to avoid false positives
+MOCK_NON_TM_PATTERNS: tuple[str, ...] = (
+    "password",
+    "laptop",
+    "computer",
+    "printer",
+    "wifi",
+    "weather",
+    "email setup",
+    "vpn",
+    "software install",
+)
+
+# Topic keywords in priority order - more specific topics come first
+MOCK_TOPIC_KEYWORDS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("employee_onboarding", (
+        "onboarding",
+        "new hire",
+        "new employee",
+        "orientation",
+        "first day",
+        "preboarding",
+    )),
+    ("succession_planning", (
+        "succession",
+        "career path",
+        "talent pool",
+        "successor",
+        "next in line",
+        "leadership pipeline",
+        "high potential",
+    )),
+    ("time_attendance", (
+        "time off",
+        "leave request",
+        "vacation",
+        "attendance",
+        "absence",
+        "pto",
+        "sick leave",
+        "timesheet",
+    )),
+    ("performance_management", (
+        "performance",
+        "review",
+        "goal",
+        "feedback",
+        "appraisal",
+        "evaluation",
+    )),
+    ("learning_development", (
+        "training",
+        "course",
+        "learn",
+        "certification",
+        "skill development",
+        "curriculum",
+    )),
+    ("recruitment", (
+        "job posting",
+        "job opening",
+        "candidate",
+        "interview",
+        "recruiting",
+        "requisition",
+        "applicant",
+    )),
+    ("compensation_benefits", (
+        "salary",
+        "bonus",
+        "pay",
+        "compensation",
+        "benefit",
+        "merit increase",
+    )),
+    ("employee_central", (
+        "employee data",
+        "org chart",
+        "profile",
+        "organization",
+        "personal information",
+        "reporting structure",
+    )),
+)
+
+
+# Keyword matchers, built once. Single-word non-TM patterns are a set checked against
+# the query's words; multi-word ones use a regex, tried only when the query contains
+# one of their first words.
+_NON_TM_WORDS = frozenset(p for p in MOCK_NON_TM_PATTERNS if " " not in p)
+_NON_TM_PHRASE_TRIGGERS = frozenset(p.split()[0] for p in MOCK_NON_TM_PATTERNS if " " in p)
+_NON_TM_PHRASE_RE = re.compile(trie_pattern(p for p in MOCK_NON_TM_PATTERNS if " " in p))
+
+# Each topic is a capture group (in priority order) inside a lookahead, so finditer
+# reports every position where any keyword starts, and match.lastindex is the
+# highest-priority topic matching there.
+_TOPIC_RE = re.compile("(?=" + "|".join(
+    "(" + trie_pattern(keywords) + ")" for _, keywords in MOCK_TOPIC_KEYWORDS
+) + ")")
+
+_NON_TM_SUMMARY = "[MOCK] This doesn't seem to be a Talent Management question. I can help with topics like performance reviews, time off, learning, and more."
+
+# Response for queries matching a non-TM pattern
+_NON_TM_RESPONSE = MappingProxyType({
+    "is_talent_management": False,
+    "confidence": 0.90,
+    "topic": None,
+    "topic_display_name": None,
+    "links": (),
+    "summary": _NON_TM_SUMMARY,
+})
+
+# Response for queries matching no keyword at all
+_UNMATCHED_RESPONSE = MappingProxyType({**_NON_TM_RESPONSE, "confidence": 0.80})
+
+_TOPIC_RESPONSES: dict[str, MappingProxyType] = {
+    topic: MappingProxyType({
+        "is_talent_management": True,
+        "confidence": 0.85,
+        "topic": topic,
+        "topic_display_name": TOPIC_DISPLAY_NAMES[topic],
+        "links": TOPIC_LINK_MODELS[topic],
+        "summary": f"[MOCK] I can help you with {TOPIC_DISPLAY_NAMES[topic]}. Here are some resources that should answer your question.",
+    })
+    for topic, _ in MOCK_TOPIC_KEYWORDS
+}
+
+# Topic responses indexed by _TOPIC_RE group number (groups start at 1)
+_GROUP_RESPONSES: tuple[MappingProxyType | None, ...] = (None, *(_TOPIC_RESPONSES[topic] for topic, _ in MOCK_TOPIC_KEYWORDS))
+
+
+@functools.lru_cache(maxsize=1024)
+def mock_classify(query_lower: str) -> MappingProxyType:
+    """
+    Classify a lowercased query by keyword matching.
+
+    The result is shared and read-only; copy it with dict() before adding keys.
+    """
+    # Non-TM patterns are checked first (to avoid false positives)
+    words = query_words(query_lower)
+    if words & _NON_TM_WORDS or (
+        words & _NON_TM_PHRASE_TRIGGERS and _NON_TM_PHRASE_RE.search(query_lower)
+    ):
+        return _NON_TM_RESPONSE
+
+    # One scan finds every keyword; the lowest group number is the highest-priority topic,
+    # so the scan can stop as soon as the first topic matches
+    group = None
+    for match in _TOPIC_RE.finditer(query_lower):
+        if group is None or match.lastindex < group:
+            group = match.lastindex
+            if group == 1:
+                break
+    if group is not None:
+        return _GROUP_RESPONSES[group]
+
+    return _UNMATCHED_RESPONSE
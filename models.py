@@ -7,10 +7,24 @@ These models provide:
 3. OpenAPI schema generation for Joule Action import
 """
 
-from pydantic import BaseModel, Field
+from typing import Annotated
 
+from pydantic import BaseModel, ConfigDict, Field
 
-class ClassifyRequest(BaseModel):
+# Upper bound on the number of queries in one batch classification request
+MAX_BATCH_QUERIES = 100
+
+
+class ImmutableModel(BaseModel):
+    """
+    Base for all API models. Instances are frozen: responses are built once and
+    some (like the topic LinkInfo models) are shared across requests.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+
+class ClassifyRequest(ImmutableModel):
     """Request model for the classification endpoint."""
 
     query: str = Field(
@@ -26,7 +40,19 @@ class ClassifyRequest(BaseModel):
     )
 
 
-class LinkInfo(BaseModel):
+class BatchClassifyRequest(ImmutableModel):
+    """Request model for the batch classification endpoint."""
+
+    queries: list[Annotated[str, Field(min_length=1, max_length=2000)]] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_QUERIES,
+        description="The user queries to classify",
+        json_schema_extra={"example": ["How do I submit my annual performance review?", "How do I request time off?"]},
+    )
+
+
+class LinkInfo(ImmutableModel):
     """Information about a help resource link."""
 
     title: str = Field(..., description="Title of the help resource")
@@ -35,7 +61,7 @@ class LinkInfo(BaseModel):
 
 
 # Pipeline visibility models for demo purposes
-class ContentFilterScores(BaseModel):
+class ContentFilterScores(ImmutableModel):
     """Content safety scores from Azure Content Safety."""
 
     hate: int = Field(0, description="Hate speech score (0=safe)")
@@ -45,7 +71,7 @@ class ContentFilterScores(BaseModel):
     passed: bool = Field(..., description="Whether content passed filtering")
 
 
-class DataMaskingDetails(BaseModel):
+class DataMaskingDetails(ImmutableModel):
     """Details about PII masking applied to the query."""
 
     original_query: str = Field(..., description="Original user query")
@@ -55,7 +81,7 @@ class DataMaskingDetails(BaseModel):
     )
 
 
-class LLMDetails(BaseModel):
+class LLMDetails(ImmutableModel):
     """Details about the LLM processing."""
 
     model: str = Field(..., description="Model used for classification")
@@ -63,21 +89,21 @@ class LLMDetails(BaseModel):
     completion_tokens: int = Field(0, description="Tokens in the response")
 
 
-class LLMMessage(BaseModel):
+class LLMMessage(ImmutableModel):
     """A message in the LLM conversation."""
 
     role: str = Field(..., description="Message role (system/user)")
     content: str = Field(..., description="Message content (with PII masked)")
 
 
-class ContentFilteringDetails(BaseModel):
+class ContentFilteringDetails(ImmutableModel):
     """Input and output content filter results."""
 
     input: ContentFilterScores = Field(..., description="Input content filter scores")
     output: ContentFilterScores = Field(..., description="Output content filter scores")
 
 
-class PipelineDetails(BaseModel):
+class PipelineDetails(ImmutableModel):
     """Orchestration pipeline processing details."""
 
     data_masking: DataMaskingDetails | None = Field(
@@ -92,7 +118,7 @@ class PipelineDetails(BaseModel):
     )
 
 
-class ClassifyResponse(BaseModel):
+class ClassifyResponse(ImmutableModel):
     """Response model for the classification endpoint."""
 
     is_talent_management: bool = Field(
@@ -150,9 +176,27 @@ class ClassifyResponse(BaseModel):
     }
 
 
-class HealthResponse(BaseModel):
+class BatchClassifyResponse(ImmutableModel):
+    """Response model for the batch classification endpoint."""
+
+    results: list[ClassifyResponse] = Field(
+        ..., description="Classification results, in the same order as the queries"
+    )
+
+
+class HealthResponse(ImmutableModel):
     """Response model for health check endpoint."""
 
     status: str = Field(..., description="Health status of the service")
     service: str = Field(..., description="Name of the service")
     version: str = Field(..., description="API version")
+
+
+class ServiceInfoResponse(ImmutableModel):
+    """Response model for the root endpoint."""
+
+    service: str = Field(..., description="Name of the API")
+    version: str = Field(..., description="API version")
+    docs: str = Field(..., description="Path to the Swagger UI")
+    health: str = Field(..., description="Path to the health check endpoint")
+    classify: str = Field(..., description="Path to the classification endpoint")
@@ -0,0 +1,167 @@
+"""
+Orchestration Pipeline Details
+
+Builds the `pipeline` section returned when a request sets show_pipeline
+(data masking, content filtering, LLM usage and the messages sent to the LLM).
+Only debug requests use it, which keeps this code off classify()'s hot path.
+"""
+
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # Only for annotations; the SDK may not be installed locally
+    from gen_ai_hub.orchestration.exceptions import OrchestrationError
+    from gen_ai_hub.orchestration.models.response import OrchestrationResponse
+
+# Masked entity placeholders and the user message in the masked template
+_MASK_RE = re.compile(r"MASKED_(\w+)")
+_CLASSIFY_RE = re.compile(r"Classify this query:\s*(.+?)(?:\n|$)")
+
+
+def extract_pipeline_details(original_query: str, result: "OrchestrationResponse") -> dict:
+    """Extract pipeline processing details from orchestration result."""
+    mr = result.module_results
+
+    # Extract masked query and entities from input_masking
+    masked_query = original_query
+    entities_masked = []
+    if mr.input_masking and mr.input_masking.data:
+        masked_template = mr.input_masking.data.get("masked_template", "")
+        # Extract entity types like MASKED_PERSON, MASKED_EMAIL
+        entities_masked = list({*_MASK_RE.findall(masked_template)})
+        # Try to extract the masked user query from the template
+        # The template structure is: system message + user message with masked content
+        if "Classify this query:" in masked_template:
+            match = _CLASSIFY_RE.search(masked_template)
+            if match:
+                masked_query = match.group(1).strip()
+
+    # Extract messages sent to LLM from templating module
+    messages_to_llm = []
+    if mr.templating:
+        for msg in mr.templating:
+            messages_to_llm.append({"role": msg.role, "content": msg.content})
+
+    # Extract content filtering scores
+    input_filter = {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": True}
+    output_filter = {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": True}
+
+    if mr.input_filtering and mr.input_filtering.data:
+        azure_scores = mr.input_filtering.data.get("azure_content_safety", {})
+        input_filter = {
+            "hate": azure_scores.get("Hate", 0),
+            "self_harm": azure_scores.get("SelfHarm", 0),
+            "sexual": azure_scores.get("Sexual", 0),
+            "violence": azure_scores.get("Violence", 0),
+            "passed": True,
+        }
+
+    if mr.output_filtering and mr.output_filtering.data:
+        choices = mr.output_filtering.data.get("choices", [{}])
+        if choices:
+            azure_scores = choices[0].get("azure_content_safety", {})
+            output_filter = {
+                "hate": azure_scores.get("Hate", 0),
+                "self_harm": azure_scores.get("SelfHarm", 0),
+                "sexual": azure_scores.get("Sexual", 0),
+                "violence": azure_scores.get("Violence", 0),
+                "passed": True,
+            }
+
+    # Extract LLM details
+    orch = result.orchestration_result
+    llm_details = {
+        "model": orch.model if hasattr(orch, "model") else "unknown",
+        "prompt_tokens": orch.usage.prompt_tokens if hasattr(orch, "usage") and orch.usage else 0,
+        "completion_tokens": orch.usage.completion_tokens if hasattr(orch, "usage") and orch.usage else 0,
+    }
+
+    return {
+        "data_masking": {
+            "original_query": original_query,
+            "masked_query": masked_query,
+            "entities_masked": entities_masked,
+        } if entities_masked else None,
+        "content_filtering": {
+            "input": input_filter,
+            "output": output_filter,
+        },
+        "llm": llm_details,
+        "messages_to_llm": messages_to_llm,
+    }
+
+
+def extract_pipeline_from_error(original_query: str, error: "OrchestrationError") -> dict:
+    """Extract pipeline details from an OrchestrationError (e.g., content filter block)."""
+    # Access module_results from the exception
+    mr = getattr(error, "module_results", {}) or {}
+
+    # Extract masked query if available
+    # Structure: input_masking -> data -> masked_template
+    masked_query = original_query
+    entities_masked = []
+    input_masking = mr.get("input_masking", {})
+    if input_masking:
+        masking_data = input_masking.get("data", {})
+        masked_template = masking_data.get("masked_template", "")
+        entities_masked = list({*_MASK_RE.findall(masked_template)})
+        if "Classify this query:" in masked_template:
+            match = _CLASSIFY_RE.search(masked_template)
+            if match:
+                masked_query = match.group(1).strip()
+
+    # Extract input filtering scores (this is where the block happened)
+    # Structure: input_filtering -> data -> azure_content_safety
+    input_filter = {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": True}
+    input_filtering = mr.get("input_filtering", {})
+    if input_filtering:
+        filter_data = input_filtering.get("data", {})
+        azure_scores = filter_data.get("azure_content_safety", {})
+        input_filter = {
+            "hate": azure_scores.get("Hate", 0),
+            "self_harm": azure_scores.get("SelfHarm", 0),
+            "sexual": azure_scores.get("Sexual", 0),
+            "violence": azure_scores.get("Violence", 0),
+            "passed": False,  # Content was blocked
+        }
+
+    # Output filtering won't have run if input was blocked
+    output_filter = {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": False}
+
+    # Extract templating messages if available
+    messages_to_llm = []
+    templating = mr.get("templating", [])
+    if templating:
+        for msg in templating:
+            if isinstance(msg, dict):
+                messages_to_llm.append({"role": msg.get("role", ""), "content": msg.get("content", "")})
+
+    return {
+        "data_masking": {
+            "original_query": original_query,
+            "masked_query": masked_query,
+            "entities_masked": entities_masked,
+        } if entities_masked else None,
+        "content_filtering": {
+            "input": input_filter,
+            "output": output_filter,
+        },
+        "llm": {"model": "blocked", "prompt_tokens": 0, "completion_tokens": 0},
+        "messages_to_llm": messages_to_llm,
+    }
+
+
+def mock_pipeline_details(query: str) -> dict:
+    """Generate mock pipeline details for local testing."""
+    return {
+        "data_masking": None,  # No masking in mock mode
+        "content_filtering": {
+            "input": {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": True},
+            "output": {"hate": 0, "self_harm": 0, "sexual": 0, "violence": 0, "passed": True},
+        },
+        "llm": {"model": "mock", "prompt_tokens": 0, "completion_tokens": 0},
+        "messages_to_llm": [
+            {"role": "system", "content": "[MOCK] System prompt would appear here"},
+            {"role": "user", "content": f"Classify this query: {query}"},
+        ],
+    }
@@ -0,0 +1,52 @@
+"""
+In-process Response Cache for Classification Results
+
+Every LLM-backed classification is a full round-trip to the Orchestration
+Service. Repeated queries (e.g. many users asking "How do I submit my review?")
+are served from this cache instead, keyed by a normalized form of the query.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for cache lookups (lowercased, whitespace-collapsed)."""
+    return _WHITESPACE_RE.sub(" ", query.strip().lower())
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of classification response dicts."""
+
+    def __init__(self, maxsize: int = 4096):
+        self._maxsize = maxsize
+        self._data: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        """Return a copy of the cached response, or None on a miss."""
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                return None
+            self._data.move_to_end(key)
+        return dict(value)
+
+    def put(self, key: str, value: dict) -> None:
+        """Store a copy of a response, evicting the least recently used entry."""
+        with self._lock:
+            self._data[key] = dict(value)
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -3,90 +3,353 @@
 Local test script for the intent classifier.
 
 Run this to validate the mock classification logic works before
-setting up the full GenAI Hub integration.
+setting up the full GenAI Hub integration:
+
+    python test_local.py        # or: pytest test_local.py
+
+Running the tests in parallel needs pytest-xdist from requirements-dev.txt:
+
+    pip install -r requirements-dev.txt && pytest -n auto test_local.py
 """
 
+import asyncio
+import json
 import sys
+from types import SimpleNamespace
 sys.path.insert(0, ".")
 
+import pytest
+
 from topic_links import get_topics_for_prompt, TOPIC_LINKS
 
+# Mock classification cases: (query, expected_topic, expected_is_tm)
+MOCK_TEST_CASES = [
+    ("How do I submit my annual performance review?", "performance_management", True),
+    ("I need to request time off for next week", "time_attendance", True),
+    ("Where can I find training courses?", "learning_development", True),
+    ("How do I post a job opening?", "recruitment", True),
+    ("What is my current salary?", "compensation_benefits", True),
+    ("Who is next in line for the VP role?", "succession_planning", True),
+    ("New hire onboarding checklist", "employee_onboarding", True),
+    ("Update my profile picture", "employee_central", True),
+    ("What is the weather today?", None, False),
+    ("How do I reset my laptop password?", None, False),
+]
+
+
+@pytest.fixture(scope="session")
+def classifier():
+    """One classifier for the whole session (warms the SDK import and keyword regexes)."""
+    # Import here to avoid issues if dependencies aren't installed
+    from intent_classifier import IntentClassifier
+
+    return IntentClassifier()
+
 
 def test_topic_links():
     """Test that topic links are properly defined."""
-    print("=== Testing Topic Links ===\n")
-
     assert len(TOPIC_LINKS) == 8, f"Expected 8 topics, got {len(TOPIC_LINKS)}"
-    print(f"✓ Found {len(TOPIC_LINKS)} topics")
 
     for key, info in TOPIC_LINKS.items():
         assert "display_name" in info, f"Missing display_name for {key}"
         assert "keywords" in info, f"Missing keywords for {key}"
         assert "links" in info, f"Missing links for {key}"
         assert len(info["links"]) >= 1, f"No links for {key}"
-        print(f"  ✓ {key}: {info['display_name']} ({len(info['links'])} links)")
-
-    print("\n✓ All topic links validated\n")
 
 
 def test_prompt_generation():
     """Test prompt generation for topics."""
-    print("=== Testing Prompt Generation ===\n")
-
     prompt = get_topics_for_prompt()
     assert len(prompt) > 0, "Prompt should not be empty"
 
     for topic in TOPIC_LINKS.keys():
         assert topic in prompt, f"Topic {topic} missing from prompt"
 
-    print("Generated prompt for LLM:\n")
-    print(prompt)
-    print("\n✓ Prompt generation works\n")
 
+def test_response_cache():
+    """Test the LRU response cache and query normalization."""
+    from response_cache import ResponseCache, normalize_query
 
-def test_mock_classification():
-    """Test the mock classification without GenAI Hub."""
-    print("=== Testing Mock Classification ===\n")
+    assert normalize_query("  How do I   submit\tmy REVIEW? ") == "how do i submit my review?"
 
-    # Import here to avoid issues if dependencies aren't installed
+    cache = ResponseCache(maxsize=2)
+    cache.put("a", {"topic": "recruitment"})
+    cache.put("b", {"topic": "time_attendance"})
+    assert cache.get("a") == {"topic": "recruitment"}
+    cache.put("c", {"topic": "employee_central"})  # evicts "b" (least recently used)
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    # Callers get copies, so mutating a hit does not corrupt the cache
+    cache.get("a")["pipeline"] = {}
+    assert "pipeline" not in cache.get("a")
+
+
+def test_non_tm_prefilter(classifier):
+    """Test the pre-LLM screen for clearly non-TM queries."""
+    screened = classifier._prefilter("what is the weather today?")
+    assert screened is not None and screened["is_talent_management"] is False
+    # A TM word means the LLM decides, even if a non-TM word is present
+    assert classifier._prefilter("is there training on the new printer?") is None
+    assert classifier._prefilter("how do i submit my performance review?") is None
+    # TM words count at word starts, so plurals and compounds still reach the LLM...
+    assert classifier._prefilter("my computer crashed while i was filling in my appraisals") is None
+    assert classifier._prefilter("the printer won't print my paycheck stub") is None
+    assert classifier._prefilter("do we get a wifi allowance as part of remuneration?") is None
+    # ...but not inside other words ("pto" in "laptop")
+    assert classifier._prefilter("my laptop won't boot") is not None
+
+
+def test_json_object_scanner():
+    """Test detection of the end of a streamed JSON object."""
+    from intent_classifier import _JsonObjectScanner
+
+    scanner = _JsonObjectScanner()
+    # Braces and escaped quotes inside strings must not end the object early
+    assert scanner.feed('{"summary": "a {b} \\"c') is None
+    assert scanner.feed('\\" }", "x": {}') is None
+    assert scanner.feed('}\n\n') == 1
+
+
+def test_classification_result_validation():
+    """Test that LLM output with wrong types or out-of-range values is rejected."""
+    from intent_classifier import ClassificationResult
+
+    result = ClassificationResult.from_json(
+        '{"is_talent_management": true, "confidence": 1, "topic": "recruitment", "extra": 1}'
+    )
+    # Missing fields get defaults and unknown ones are ignored
+    assert result == ClassificationResult(True, 1.0, "recruitment", "", "")
+
+    for content in [
+        '{"is_talent_management": true, "confidence": 1.3, "topic": "recruitment"}',
+        '{"is_talent_management": true, "confidence": "0.9", "topic": "recruitment"}',
+        '{"is_talent_management": "yes", "confidence": 0.9, "topic": "recruitment"}',
+        '{"is_talent_management": true, "confidence": 0.9, "topic": "payroll"}',
+        '{"is_talent_management": true, "confidence": 0.9, "summary": null}',
+        '[]',
+    ]:
+        with pytest.raises(ValueError):
+            ClassificationResult.from_json(content)
+
+
+def test_async_batcher():
+    """Test that the batcher splits, orders and fails batches per waiter."""
+    from batcher import AsyncBatcher
+
+    batches = []
+
+    def handler(queries):
+        batches.append(list(queries))
+        if "fail" in queries:
+            raise ValueError("batch failed")
+        return [query.upper() for query in queries]
+
+    async def run():
+        batcher = AsyncBatcher(handler, max_batch=2, max_wait=0.05)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(*(batcher.submit(q) for q in ["a", "b", "c", "d", "e"]))
+            failures = await asyncio.gather(
+                batcher.submit("fail"), batcher.submit("other"), return_exceptions=True
+            )
+        finally:
+            await batcher.stop()
+        return results, failures
+
+    results, failures = asyncio.run(run())
+
+    # Each waiter gets its own result, and no batch exceeds max_batch
+    assert results == ["A", "B", "C", "D", "E"]
+    assert [len(batch) for batch in batches[:3]] == [2, 2, 1]
+    # An exception in the handler reaches every query of that batch
+    assert all(isinstance(failure, ValueError) for failure in failures)
+
+
+class _StubOrchestration:
+    """Stands in for OrchestrationService, answering each run() with reply(template value)."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def run(self, template_values):
+        value = template_values[0].value
+        self.calls.append(value)
+        message = SimpleNamespace(content=self.reply(value))
+        return SimpleNamespace(
+            orchestration_result=SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        )
+
+
+def _llm_reply(summary: str) -> dict:
+    return {
+        "is_talent_management": True,
+        "confidence": 0.9,
+        "topic": "recruitment",
+        "reasoning": "Recruiting question",
+        "summary": summary,
+    }
+
+
+@pytest.fixture
+def stub_classifier():
+    """A classifier whose single and batch services are stubs (no network or credentials needed)."""
+    pytest.importorskip("gen_ai_hub")
     from intent_classifier import IntentClassifier
 
-    classifier = IntentClassifier()
-
-    # Test cases: (query, expected_topic, expected_is_tm)
-    test_cases = [
-        ("How do I submit my annual performance review?", "performance_management", True),
-        ("I need to request time off for next week", "time_attendance", True),
-        ("Where can I find training courses?", "learning_development", True),
-        ("How do I post a job opening?", "recruitment", True),
-        ("What is my current salary?", "compensation_benefits", True),
-        ("Who is next in line for the VP role?", "succession_planning", True),
-        ("New hire onboarding checklist", "employee_onboarding", True),
-        ("Update my profile picture", "employee_central", True),
-        ("What is the weather today?", None, False),
-        ("How do I reset my laptop password?", None, False),
+    stub = IntentClassifier()
+    stub._service = _StubOrchestration(lambda query: json.dumps(_llm_reply(f"single: {query}")))
+    stub._batch_service = _StubOrchestration(
+        lambda queries_json: json.dumps(
+            {"results": [_llm_reply(f"batch: {query}") for query in json.loads(queries_json)]}
+        )
+    )
+    return stub
+
+
+def test_classify_batch_dedup_and_cache(stub_classifier):
+    """Test that classify_batch sends duplicates once and skips cached queries."""
+    results = stub_classifier.classify_batch(
+        ["How do I post a job?", "how do I  post a JOB?", "Who reviews new candidates?"]
+    )
+
+    # One orchestration call, with the normalized duplicate sent only once
+    assert len(stub_classifier._batch_service.calls) == 1
+    assert json.loads(stub_classifier._batch_service.calls[0]) == [
+        "How do I post a job?", "Who reviews new candidates?"
     ]
+    assert [r["summary"] for r in results] == [
+        "batch: How do I post a job?", "batch: How do I post a job?", "batch: Who reviews new candidates?"
+    ]
+
+    # Cached queries never reach the LLM again; the remaining one is classified alone
+    results = stub_classifier.classify_batch(["how do i post a job?", "Where are open requisitions?"])
+    assert results[0]["summary"] == "batch: How do I post a job?"
+    assert len(stub_classifier._batch_service.calls) == 1
+    assert stub_classifier._service.calls == ["Where are open requisitions?"]
+
+
+def test_classify_batch_count_mismatch(stub_classifier):
+    """Test that a batch reply with the wrong number of results falls back to single calls."""
+    stub_classifier._batch_service.reply = lambda queries_json: json.dumps(
+        {"results": [_llm_reply("only one")]}
+    )
+    queries = ["How do I post a job?", "Who reviews new candidates?"]
+    results = stub_classifier.classify_batch(queries)
+
+    assert sorted(stub_classifier._service.calls) == sorted(queries)
+    assert [r["summary"] for r in results] == [f"single: {query}" for query in queries]
+
+
+def _orchestration_error(code: int, location: str) -> Exception:
+    from intent_classifier import OrchestrationError
+
+    return OrchestrationError(
+        request_id="test", message="error", code=code, location=location, module_results={}
+    )
+
+
+def test_classify_batch_errors(stub_classifier, monkeypatch):
+    """Test that only content-filter errors make a failed batch fall back to single calls."""
+    import intent_classifier
+
+    monkeypatch.setattr(intent_classifier, "ORCHESTRATION_RETRY_BACKOFF", 0)
+    queries = ["How do I post a job?", "Who reviews new candidates?"]
+
+    def rate_limited(queries_json):
+        raise _orchestration_error(429, "LLM Module")
+
+    stub_classifier._batch_service.reply = rate_limited
+    results = stub_classifier.classify_batch(queries)
+    # Retried, then answered with the fallback - no per-query calls add to the load
+    assert len(stub_classifier._batch_service.calls) == intent_classifier.ORCHESTRATION_MAX_RETRIES + 1
+    assert stub_classifier._service.calls == []
+    assert [r["summary"] for r in results] == [intent_classifier._FALLBACK_RESPONSE["summary"]] * 2
+
+    def blocked(queries_json):
+        raise _orchestration_error(400, "Filtering Module - Input Filter")
 
-    passed = 0
-    failed = 0
+    stub_classifier._batch_service.reply = blocked
+    results = stub_classifier.classify_batch(queries)
+    assert stub_classifier._service.calls == queries
+    assert [r["summary"] for r in results] == [f"single: {query}" for query in queries]
 
-    for query, expected_topic, expected_is_tm in test_cases:
-        result = classifier.classify(query)
 
-        is_tm_match = result["is_talent_management"] == expected_is_tm
-        topic_match = result["topic"] == expected_topic
+class _StubStream:
+    """Stands in for the SDK's SSEClient, yielding content deltas (or raising an error)."""
 
-        if is_tm_match and (not expected_is_tm or topic_match):
-            print(f"  ✓ '{query[:40]}...'")
-            print(f"    → {result['topic_display_name'] or 'Not TM'} (confidence: {result['confidence']})")
-            passed += 1
-        else:
-            print(f"  ✗ '{query[:40]}...'")
-            print(f"    Expected: {expected_topic}, Got: {result['topic']}")
-            failed += 1
+    def __init__(self, deltas):
+        self._deltas = iter(deltas)
+        self.consumed = 0
+        self.exited = False
 
-    print(f"\n{'✓' if failed == 0 else '✗'} {passed}/{len(test_cases)} tests passed\n")
-    return failed == 0
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        delta = next(self._deltas)
+        self.consumed += 1
+        if isinstance(delta, Exception):
+            raise delta
+        choice = SimpleNamespace(delta=SimpleNamespace(content=delta))
+        return SimpleNamespace(orchestration_result=SimpleNamespace(choices=[choice]))
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.exited = True
+
+
+def test_streaming(stub_classifier, monkeypatch):
+    """Test that streaming stops at the end of the JSON object, retries and always closes."""
+    import intent_classifier
+
+    monkeypatch.setattr(intent_classifier, "ORCHESTRATION_STREAMING", True)
+    monkeypatch.setattr(intent_classifier, "ORCHESTRATION_RETRY_BACKOFF", 0)
+    reply = json.dumps(_llm_reply("streamed"))
+    streams = [
+        _StubStream([_orchestration_error(429, "LLM Module")]),
+        _StubStream([reply[:20], reply[20:] + "\n", "never read"]),
+        _StubStream([reply[:20], _orchestration_error(400, "Filtering Module - Output Filter")]),
+    ]
+    stub_classifier._service.stream = lambda template_values: streams.pop(0)
+    opened = list(streams)
+
+    result = stub_classifier.classify("How do I post a job?")
+    blocked = stub_classifier.classify("Who reviews new candidates?")
+
+    # The rate-limited stream is retried, reading stops at the closing brace, and a
+    # mid-stream error still closes the stream
+    assert result["summary"] == "streamed" and result["topic"] == "recruitment"
+    assert blocked["is_talent_management"] is False
+    assert [stream.consumed for stream in opened] == [1, 2, 2]
+    assert all(stream.exited for stream in opened)
+
+
+@pytest.mark.parametrize("topic", [*TOPIC_LINKS, None])
+@pytest.mark.parametrize("summary", [
+    "Here are resources for your question.",
+    'Quotes "like this", a backslash \\ and a newline\n, naïve café — 日本語 </script>',
+])
+def test_pre_serialized_response(classifier, topic, summary):
+    """Test that pre-serialized response bodies match pydantic's serialization exactly."""
+    from app import _render_classify_response, _to_classify_response
+    from intent_classifier import ClassificationResult
+
+    result = classifier._format_response(
+        ClassificationResult(topic is not None, 0.87, topic, "Reasoning", summary)
+    )
+    expected = _to_classify_response(result).model_dump_json().encode()
+    assert _render_classify_response(result) == expected
+
+
+@pytest.mark.parametrize("query,expected_topic,expected_is_tm", MOCK_TEST_CASES)
+def test_mock_classification(classifier, query, expected_topic, expected_is_tm):
+    """Test the mock classification without GenAI Hub."""
+    result = classifier.classify(query)
+
+    assert result["is_talent_management"] == expected_is_tm, f"'{query}' → {result}"
+    if expected_is_tm:
+        assert result["topic"] == expected_topic, f"Expected: {expected_topic}, Got: {result['topic']}"
 
 
 if __name__ == "__main__":
@@ -94,12 +357,4 @@ if __name__ == "__main__":
     print("Talent Management Intent Classifier - Local Tests")
     print("=" * 60 + "\n")
 
-    test_topic_links()
-    test_prompt_generation()
-    success = test_mock_classification()
-
-    print("=" * 60)
-    print("TEST SUMMARY: " + ("ALL PASSED ✓" if success else "SOME FAILED ✗"))
-    print("=" * 60 + "\n")
-
-    sys.exit(0 if success else 1)
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,48 @@
+"""
+Query Text Utilities
+
+Word splitting and keyword regexes shared by the mock classifier and the LLM pre-filter.
+"""
+
+import re
+import string
+from collections.abc import Iterable
+
+# Punctuation (ASCII plus typographic quotes, dashes and ellipsis) becomes a space,
+# so str.split() yields the words of a lowercased query
+_WORD_SEPARATORS = str.maketrans(
+    dict.fromkeys(string.punctuation + "\u2018\u2019\u201c\u201d\u2013\u2014\u2026", " ")
+)
+
+
+def query_words(query_lower: str) -> set[str]:
+    """Split a lowercased query into its set of words, ignoring punctuation."""
+    return set(query_lower.translate(_WORD_SEPARATORS).split())
+
+
+def trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Build a regex matching any of the keywords, structured as a character trie.
+
+    Keywords sharing a prefix ("new hire", "new employee") share one branch
+    ("new (?:hire|employee)"), so the regex engine doesn't re-read that prefix
+    for every alternative at every position of the query.
+    """
+    trie: dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of a keyword
+
+    def build(node: dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        pattern = "(?:" + "|".join(branches) + ")"
+        # A keyword ends here, so the rest is optional (any match is enough)
+        return pattern + "?" if "" in node else pattern
+
+    return build(trie)
@@ -9,8 +9,11 @@ SAP Help Portal documentation links. Each topic includes:
 - Relevant SAP Help Portal links with descriptions
 """
 
+import functools
 from typing import TypedDict
 
+from models import LinkInfo as LinkInfoModel
+
 
 class LinkInfo(TypedDict):
     title: str
@@ -120,6 +123,8 @@ TOPIC_LINKS: dict[str, TopicInfo] = {
             "equity",
             "rewards",
             "variable pay",
+            "remuneration",
+            "allowance",
         ],
         "links": [
             {
@@ -244,6 +249,17 @@ TOPIC_LINKS: dict[str, TopicInfo] = {
     },
 }
 
+# Per-topic data precomputed once at import so the request path only does lookups.
+# Links are ready-made LinkInfo response models, shared (immutably) across requests.
+TOPIC_LINK_MODELS: dict[str, tuple[LinkInfoModel, ...]] = {
+    topic: tuple(LinkInfoModel.model_construct(**link) for link in info["links"])
+    for topic, info in TOPIC_LINKS.items()
+}
+
+TOPIC_DISPLAY_NAMES: dict[str, str] = {
+    topic: info["display_name"] for topic, info in TOPIC_LINKS.items()
+}
+
 
 def get_topic_info(topic_key: str) -> TopicInfo | None:
     """Get topic information by key."""
@@ -255,10 +271,15 @@ def get_all_topics() -> list[str]:
     return list(TOPIC_LINKS.keys())
 
 
+@functools.cache
 def get_topics_for_prompt() -> str:
-    """Generate a formatted string of topics for the LLM prompt."""
-    lines = []
-    for key, info in TOPIC_LINKS.items():
-        keywords = ", ".join(info["keywords"][:5])  # First 5 keywords
-        lines.append(f"- {key}: {info['display_name']} (examples: {keywords})")
-    return "\n".join(lines)
+    """
+    Generate a compact topic table for the LLM prompt (built once, TOPIC_LINKS is static).
+
+    One line per topic, "key: keyword, keyword, ...". Display names are left out since
+    the key carries the same meaning and the API adds the display name itself.
+    """
+    return "\n".join(
+        f"{key}: {', '.join(info['keywords'][:5])}"  # First 5 keywords
+        for key, info in TOPIC_LINKS.items()
+    )